@@ -3,28 +3,94 @@
 Generate LOD performance test scene with 1000 entities
 """
 
-import json
 import math
+import sys
 
-def generate_performance_scene():
-    scene = {
-        "name": "testlod-performance",
-        "version": "1.0",
-        "entities": [],
-        "metadata": {
-            "description": "LOD performance test scene with 1000+ entities",
-            "test_cases": [
-                "LOD calculation performance with many entities",
-                "Memory usage patterns",
-                "Batch processing efficiency",
-                "Thread safety under load"
-            ],
-            "entity_count": 1000
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+MESH_VARIANTS = 10
+MESH_PATHS = [f"models/performance_obj_{i}.glb" for i in range(MESH_VARIANTS)]
+HIGH_PATHS = [f"models/lod/performance_obj_{i}_high.glb" for i in range(MESH_VARIANTS)]
+LOW_PATHS = [f"models/lod/performance_obj_{i}_low.glb" for i in range(MESH_VARIANTS)]
+MATERIAL_PATH = "materials/default.json"
+
+# Indexed by LODComponent "template" when the scene is written with --mesh-templates
+MESH_TEMPLATES = [
+    {"path": MESH_PATHS[i], "high_quality_path": HIGH_PATHS[i], "low_quality_path": LOW_PATHS[i]}
+    for i in range(MESH_VARIANTS)
+]
+
+# Shared by every entity; the JSON encoders only read them
+IDENTITY_ROTATION = [0, 0, 0, 1]
+UNIT_SCALE = [1, 1, 1]
+
+def grid_positions(grid_size, count):
+    """Return (x, y, z) positions for the first `count` cells of the grid"""
+    half = grid_size / 2
+    if np is None:
+        return [
+            ((x - half) * 2.0 + (x % 3) * 0.5,
+             (x + z) % 3 * 0.5,
+             (z - half) * 2.0 + (z % 3) * 0.5)
+            for x in range(grid_size)
+            for z in range(grid_size)
+        ][:count]
+
+    xs, zs = np.meshgrid(np.arange(grid_size), np.arange(grid_size), indexing='ij')
+    xs = xs.ravel()[:count]
+    zs = zs.ravel()[:count]
+
+    # Position entities in a grid with some randomness
+    pos_x = (xs - half) * 2.0 + (xs % 3) * 0.5
+    pos_z = (zs - half) * 2.0 + (zs % 3) * 0.5
+    pos_y = ((xs + zs) % 3) * 0.5  # Vary height slightly
+
+    return list(zip(pos_x.tolist(), pos_y.tolist(), pos_z.tolist()))
+
+SCENE_NAME = "testlod-performance"
+SCENE_VERSION = "1.0"
+SCENE_METADATA = {
+    "description": "LOD performance test scene with 1000+ entities",
+    "test_cases": [
+        "LOD calculation performance with many entities",
+        "Memory usage patterns",
+        "Batch processing efficiency",
+        "Thread safety under load"
+    ],
+    "entity_count": 1000
+}
+
+def lod_component(entity_id, variant, use_templates):
+    thresholds = [5 + (entity_id % 5), 15 + variant]
+    if use_templates:
+        return {
+            "template": variant,
+            "distance_thresholds": thresholds,
+            "quality_override": None,
+            "current_quality": "Original"
         }
+    return {
+        "path": MESH_PATHS[variant],
+        "high_quality_path": HIGH_PATHS[variant],
+        "low_quality_path": LOW_PATHS[variant],
+        "distance_thresholds": thresholds,
+        "quality_override": None,
+        "current_quality": "Original"
     }
 
+def generate_entities(use_templates=False):
+    """Yield the camera and the LOD entities one at a time"""
     # Add camera
-    scene["entities"].append({
+    yield {
         "id": 0,
         "name": "camera",
         "components": {
@@ -36,62 +102,81 @@ def generate_performance_scene():
                 "far": 1000
             }
         }
-    })
+    }
 
     # Generate 1000 entities in a grid pattern
-    entity_id = 1
-    grid_size = int(math.sqrt(1000)) + 1
-
-    for x in range(grid_size):
-        for z in range(grid_size):
-            if entity_id > 1000:
-                break
-
-            # Position entities in a grid with some randomness
-            pos_x = (x - grid_size/2) * 2.0 + (x % 3) * 0.5
-            pos_z = (z - grid_size/2) * 2.0 + (z % 3) * 0.5
-            pos_y = (x + z) % 3 * 0.5  # Vary height slightly
-
-            entity = {
-                "id": entity_id,
-                "name": f"lod_entity_{entity_id}",
-                "components": {
-                    "Transform": {
-                        "position": [pos_x, pos_y, pos_z],
-                        "rotation": [0, 0, 0, 1],
-                        "scale": [1, 1, 1]
-                    },
-                    "MeshRenderer": {
-                        "mesh_path": f"models/performance_obj_{entity_id % 10}.glb",
-                        "material_path": "materials/default.json"
-                    },
-                    "LODComponent": {
-                        "path": f"models/performance_obj_{entity_id % 10}.glb",
-                        "high_quality_path": f"models/lod/performance_obj_{entity_id % 10}_high.glb",
-                        "low_quality_path": f"models/lod/performance_obj_{entity_id % 10}_low.glb",
-                        "distance_thresholds": [5 + (entity_id % 5), 15 + (entity_id % 10)],
-                        "quality_override": None,
-                        "current_quality": "Original"
-                    }
-                }
-            }
+    entity_count = SCENE_METADATA["entity_count"]
+    grid_size = int(math.sqrt(entity_count)) + 1
 
-            scene["entities"].append(entity)
-            entity_id += 1
+    for entity_id, (pos_x, pos_y, pos_z) in enumerate(grid_positions(grid_size, entity_count), start=1):
+        variant = entity_id % MESH_VARIANTS
+        yield {
+            "id": entity_id,
+            "name": "lod_entity_" + str(entity_id),
+            "components": {
+                "Transform": {
+                    "position": [pos_x, pos_y, pos_z],
+                    "rotation": IDENTITY_ROTATION,
+                    "scale": UNIT_SCALE
+                },
+                "MeshRenderer": {
+                    "mesh_path": MESH_PATHS[variant],
+                    "material_path": MATERIAL_PATH
+                },
+                "LODComponent": lod_component(entity_id, variant, use_templates)
+            }
+        }
 
-        if entity_id > 1000:
-            break
+def scene_header(use_templates):
+    header = {"name": SCENE_NAME, "version": SCENE_VERSION}
+    if use_templates:
+        header["mesh_templates"] = MESH_TEMPLATES
+    return header
 
+def generate_performance_scene(use_templates=False):
+    scene = scene_header(use_templates)
+    scene["entities"] = list(generate_entities(use_templates))
+    scene["metadata"] = SCENE_METADATA
     return scene
 
-if __name__ == "__main__":
-    scene = generate_performance_scene()
+def compact_dumps(obj):
+    """Serialize obj to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+def write_scene_stream(f, use_templates=False):
+    """Write the compact scene to binary file f one entity at a time; returns the entity count"""
+    header = compact_dumps(scene_header(use_templates))
+    f.write(header[:-1] + b',"entities":[')
+    count = 0
+    for entity in generate_entities(use_templates):
+        if count:
+            f.write(b',')
+        f.write(compact_dumps(entity))
+        count += 1
+    f.write(b'],"metadata":' + compact_dumps(SCENE_METADATA) + b'}')
+    return count
 
+if __name__ == "__main__":
     # Write to the test scenes directory
     output_path = "/home/joao/projects/vibe-coder-3d/rust/game/scenes/tests/testlod-performance.json"
 
-    with open(output_path, 'w') as f:
-        json.dump(scene, f, indent=2)
+    # Compact by default: the engine is the only reader. --pretty for humans.
+    pretty = "--pretty" in sys.argv[1:]
+    # Reference one of MESH_TEMPLATES per entity instead of repeating the three LOD paths
+    use_templates = "--mesh-templates" in sys.argv[1:]
+
+    with open(output_path, 'wb', buffering=1 << 20) as f:
+        if pretty:
+            scene = generate_performance_scene(use_templates)
+            entity_total = len(scene["entities"])
+            if orjson is not None:
+                f.write(orjson.dumps(scene, option=orjson.OPT_INDENT_2))
+            else:
+                f.write(json.dumps(scene, indent=2).encode())
+        else:
+            entity_total = write_scene_stream(f, use_templates)
 
-    print(f"Generated performance test scene with {len(scene['entities'])} entities")
-    print(f"Output: {output_path}")
\ No newline at end of file
+    print(f"Generated performance test scene with {entity_total} entities")
+    print(f"Output: {output_path}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Fix the origin of many models at once, one background Blender per model, in parallel.
+
+Runs fix_origin_bottom.py for every '<input>\\t<output>' line of a manifest (same format as
+convert-low-poly.py --manifest), one Blender process per CPU core:
+
+    python batch_prepare.py <list.txt> [--jobs N] [--preserve-animations] [--keep-materials] [--quiet]
+
+Set BLENDER_PATH to the Blender executable if it is not on PATH.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from multiprocessing import Pool
+
+from manifest import read_manifest
+
+BLENDER_PATH = os.environ.get('BLENDER_PATH', 'blender')
+FIX_ORIGIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fix_origin_bottom.py')
+
+
+def run_blender(input_path, output_path, extra_args=()):
+    """Run fix_origin_bottom.py on one model in its own Blender process. Returns False on failure."""
+    try:
+        subprocess.run(
+            [BLENDER_PATH, '--background', '--python', FIX_ORIGIN_SCRIPT, '--', input_path, output_path, *extra_args],
+            check=True,
+        )
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"[ERROR] {input_path}: {e}")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fix model origins in parallel Blender processes')
+    parser.add_argument('manifest', help="File with one '<input>\\t<output>' line per model")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Parallel Blender processes (default: CPU count)')
+    parser.add_argument('--preserve-animations', action='store_true', help='Keep animations in the exported models')
+    parser.add_argument('--keep-materials', action='store_true', help='Keep materials and textures in GLB output')
+    parser.add_argument('--quiet', action='store_true', help='Suppress [INFO] output from Blender')
+    options = parser.parse_args()
+
+    extra_args = tuple(flag for flag, enabled in (
+        ('--preserve-animations', options.preserve_animations),
+        ('--keep-materials', options.keep_materials),
+        ('--quiet', options.quiet),
+    ) if enabled)
+
+    jobs = read_manifest(options.manifest)
+    with Pool(max(1, min(options.jobs, len(jobs)))) as pool:
+        results = pool.starmap(run_blender, [(inp, out, extra_args) for inp, out in jobs])
+
+    failed = [inp for (inp, _), ok in zip(jobs, results) if not ok]
+    print(f"[SUMMARY] Prepared {len(jobs) - len(failed)}/{len(jobs)} models")
+    if failed:
+        for input_path in failed:
+            print(f"[ERROR] Failed to prepare: {input_path}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,215 +1,165 @@
 #!/usr/bin/env python3
 import bpy
+import bmesh
 import sys
 import os
-from mathutils import Vector
+import argparse
+from dataclasses import dataclass
+from typing import Optional
 import subprocess
 
-# --- Parse command-line arguments ---
-argv = sys.argv
-if "--" not in argv:
-    print("Usage: blender --background --python convert-low-poly.py -- <input_path> <output_path> [options]")
-    print("Options:")
-    print("  --ratio <value>            : Decimation ratio (0.01-1.0, default: 0.15)")
-    print("  --texture-size <pixels>    : Resize textures to this resolution (default: 512)")
-    print("  --normal-map-size <pixels> : Separate size for normal maps (default: same as texture-size)")
-    print("  --keep-original-textures   : Don't resize any textures (preserves texture quality)")
-    print("  --remove-textures          : Remove all textures (smallest file size)")
-    print("  --fix-origin               : Fix model origin to bottom center (default: true)")
-    print("  --quality <1-5>            : Preset quality level (1=smallest, 5=highest quality)")
-    print("  --texture-format <format>  : Preferred texture format (png, jpeg) (default: png)")
-    print("  --texture-quality <0-100>  : JPEG quality when using JPEG format (default: 90)")
-    print("  --apply-texture <image_path> : Apply the specified image as a texture to all meshes")
-    print("  --webp                     : Automatically convert textures to WebP after export")
-    sys.exit(1)
-    
-args = argv[argv.index("--") + 1:]
-input_path = args[0]
-output_path = args[1]
-
-# Add --glb flag to control whether to export as GLB or FBX
-proceed_with_glb = '--glb' in args
-
-# Ensure output has .glb extension only if --glb is present
-if proceed_with_glb:
-    if not output_path.lower().endswith('.glb'):
-        output_path = f"{os.path.splitext(output_path)[0]}.glb"
-        print(f"[INFO] Corrected output path to: {output_path}")
-
-# Default settings - balanced approach
-ratio = 0.15  # 15% of original vertices
-texture_size = 512  # Resize textures to 512px
-normal_map_size = None  # Will use texture_size if not specified
-remove_textures = False
-fix_origin = True
-keep_original_textures = False
-texture_format = 'PNG'  # Default to PNG for better quality
-texture_quality = 90  # JPEG quality if using JPEG
-
-# Add --webp flag for automatic WebP pipeline
-use_webp_flag = '--webp' in args
-if use_webp_flag:
-    print('[INFO] --webp flag detected: will export as JPEG (low quality/size) and post-process to WebP')
-    texture_format = 'JPEG'
-    texture_quality = 30
-    texture_size = 32
-
-# Parse quality presets if specified
-if '--quality' in args:
-    idx = args.index('--quality')
-    if idx + 1 < len(args):
-        try:
-            quality = int(args[idx + 1])
-            if quality == 1:  # Ultra compression
-                ratio = 0.05
-                texture_size = 256
-                texture_format = 'JPEG'
-                texture_quality = 75
-            elif quality == 2:  # High compression
-                ratio = 0.1
-                texture_size = 512
-                texture_format = 'JPEG'
-                texture_quality = 85
-            elif quality == 3:  # Balanced (default)
-                ratio = 0.15
-                texture_size = 1024
-                texture_format = 'PNG'
-            elif quality == 4:  # Good quality
-                ratio = 0.25
-                texture_size = 2048
-                texture_format = 'PNG'
-            elif quality == 5:  # High quality
-                ratio = 0.4
-                texture_size = 4096
-                texture_format = 'PNG'
-                keep_original_textures = True
-            print(f"[INFO] Using quality preset {quality}")
-        except ValueError:
-            print(f"Invalid quality value: {args[idx + 1]}, using defaults")
-
-# Parse additional parameters (override presets if specified)
-if '--ratio' in args:
-    idx = args.index('--ratio')
-    if idx + 1 < len(args):
-        try:
-            ratio = float(args[idx + 1])
-        except ValueError:
-            print(f"Invalid ratio value: {args[idx + 1]}")
-            sys.exit(1)
-
-if '--texture-size' in args:
-    idx = args.index('--texture-size')
-    if idx + 1 < len(args):
-        try:
-            texture_size = int(args[idx + 1])
-        except ValueError:
-            print(f"Invalid texture size: {args[idx + 1]}")
-
-if '--normal-map-size' in args:
-    idx = args.index('--normal-map-size')
-    if idx + 1 < len(args):
-        try:
-            normal_map_size = int(args[idx + 1])
-        except ValueError:
-            print(f"Invalid normal map size: {args[idx + 1]}")
-
-if '--texture-format' in args:
-    idx = args.index('--texture-format')
-    if idx + 1 < len(args):
-        fmt = args[idx + 1].upper()
-        if fmt in ['PNG', 'JPEG']:
-            texture_format = fmt
-        else:
-            print(f"Invalid texture format: {args[idx + 1]}, using {texture_format}")
-
-if '--texture-quality' in args:
-    idx = args.index('--texture-quality')
-    if idx + 1 < len(args):
-        try:
-            texture_quality = int(args[idx + 1])
-            if texture_quality < 0:
-                texture_quality = 0
-            elif texture_quality > 100:
-                texture_quality = 100
-        except ValueError:
-            print(f"Invalid texture quality: {args[idx + 1]}")
-
-if '--remove-textures' in args:
-    remove_textures = True
-    keep_original_textures = False
-
-if '--keep-original-textures' in args:
-    keep_original_textures = True
-    
-if '--no-fix-origin' in args:
-    fix_origin = False
-
-# Add support for --apply-texture <image_path>
-apply_texture_path = None
-if '--apply-texture' in args:
-    idx = args.index('--apply-texture')
-    if idx + 1 < len(args):
-        apply_texture_path = args[idx + 1]
-        print(f"[INFO] Will apply texture: {apply_texture_path}")
-
-# Set normal map size if not specified
-if normal_map_size is None:
-    normal_map_size = texture_size
-
-print(f"[INFO] Input: {input_path}")
-print(f"[INFO] Output: {output_path}")
-print(f"[INFO] Decimation ratio: {ratio}")
-if remove_textures:
-    print(f"[INFO] Textures: Removed")
-elif keep_original_textures:
-    print(f"[INFO] Textures: Keeping originals (best quality)")
-else:
-    print(f"[INFO] Texture size: {texture_size}px")
-    print(f"[INFO] Normal map size: {normal_map_size}px")
-    print(f"[INFO] Texture format: {texture_format}")
-    if texture_format == 'JPEG':
-        print(f"[INFO] JPEG quality: {texture_quality}")
-print(f"[INFO] Fix origin: {fix_origin}")
-
-# --- Clean the scene ---
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete()
-
-# --- Import model ---
-ext = os.path.splitext(input_path)[1].lower()
-if ext == '.fbx':
-    bpy.ops.import_scene.fbx(filepath=input_path)
-elif ext in ('.glb', '.gltf'):
-    bpy.ops.import_scene.gltf(filepath=input_path)
-else:
-    print(f"Unsupported file extension: {ext}")
-    sys.exit(1)
-
-# --- Remove animations (to reduce file size) ---
-if hasattr(bpy.data, 'actions'):
-    for action in bpy.data.actions:
-        bpy.data.actions.remove(action)
-    print("[INFO] Removed all animations")
-
-# --- Find armature and main mesh ---
-armature = None
-meshes = []
-
-for obj in bpy.context.scene.objects:
-    if obj.type == 'ARMATURE':
-        armature = obj
-    elif obj.type == 'MESH':
-        meshes.append(obj)
-
-if armature:
-    print(f"[INFO] Found armature: {armature.name}")
-if meshes:
-    print(f"[INFO] Found {len(meshes)} mesh objects")
-
-# --- Optionally apply a texture to all meshes ---
-if apply_texture_path:
+# Sibling helper modules live next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fix_origin_bottom import categorize_objects, fix_origin_inplace, headless_session
+from manifest import read_manifest
+from texture_resize import resize_images
+
+# Above this many vertices the merge-by-distance cleanup costs more than it gains
+MERGE_DOUBLES_MAX_VERTICES = 500000
+
+# Quality presets: (ratio, texture_size, texture_format, texture_quality, keep_original_textures,
+# draco_bits), draco_bits being (position, normal, texcoord, color) or None to keep the track's bits
+QUALITY_PRESETS = {
+    1: (0.05, 256, 'JPEG', 75, False, None),  # Ultra compression
+    2: (0.1, 512, 'JPEG', 85, False, None),  # High compression
+    3: (0.15, 1024, 'PNG', None, False, None),  # Balanced (default)
+    4: (0.25, 2048, 'PNG', None, False, None),  # Good quality
+    5: (0.4, 4096, 'PNG', None, True, (14, 10, 12, 10)),  # High quality
+}
+
+# Quantization range accepted by the glTF exporter's Draco options
+DRACO_BITS_RANGE = range(0, 31)
+
+
+@dataclass
+class ConvertSettings:
+    ratio: float = 0.15  # 15% of original vertices
+    texture_size: int = 512  # Resize textures to 512px
+    normal_map_size: Optional[int] = None  # Will use texture_size if not specified
+    remove_textures: bool = False
+    fix_origin: bool = True
+    keep_original_textures: bool = False
+    texture_format: str = 'PNG'  # Default to PNG for better quality
+    texture_quality: int = 90  # JPEG quality if using JPEG
+    apply_texture_path: Optional[str] = None
+    merge_doubles: bool = True
+    draco_position_bits: int = 14
+    draco_normal_bits: int = 10
+    draco_texcoord_bits: int = 12
+    draco_color_bits: int = 10
+    export_glb: bool = False
+    use_webp: bool = False
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='blender --background --python convert-low-poly.py --',
+        usage='%(prog)s <input_path> <output_path> [options]\n'
+              '       %(prog)s --manifest <list.txt> [options]',
+    )
+    parser.add_argument('paths', nargs='*', help='Input and output model paths')
+    parser.add_argument('--ratio', type=float, help='Decimation ratio (0.01-1.0, default: 0.15)')
+    parser.add_argument('--texture-size', type=int, help='Resize textures to this resolution (default: 512)')
+    parser.add_argument('--normal-map-size', type=int, help='Separate size for normal maps (default: same as texture-size)')
+    parser.add_argument('--keep-original-textures', action='store_true', help="Don't resize any textures (preserves texture quality)")
+    parser.add_argument('--remove-textures', action='store_true', help='Remove all textures (smallest file size)')
+    parser.add_argument('--fix-origin', action='store_true', help='Fix model origin to bottom center (default: true)')
+    parser.add_argument('--no-fix-origin', action='store_true', help='Keep the imported model origin')
+    parser.add_argument('--quality', type=int, choices=sorted(QUALITY_PRESETS), help='Preset quality level (1=smallest, 5=highest quality)')
+    parser.add_argument('--texture-format', type=str.upper, choices=['PNG', 'JPEG'], help='Preferred texture format (png, jpeg) (default: png)')
+    parser.add_argument('--texture-quality', type=int, help='JPEG quality when using JPEG format (default: 90)')
+    parser.add_argument('--apply-texture', dest='apply_texture_path', metavar='IMAGE_PATH', help='Apply the specified image as a texture to all meshes')
+    parser.add_argument('--no-merge-doubles', action='store_true', help='Skip merging duplicate vertices before decimation')
+    parser.add_argument('--draco-pos-bits', type=int, choices=DRACO_BITS_RANGE, metavar='{0..30}',
+                        help='Draco position quantization bits (default: 14, 11 with --webp; --quality 5 uses 14)')
+    parser.add_argument('--draco-normal-bits', type=int, choices=DRACO_BITS_RANGE, metavar='{0..30}',
+                        help='Draco normal quantization bits (default: 10, 8 with --webp; --quality 5 uses 10)')
+    parser.add_argument('--glb', action='store_true', help='Export as GLB instead of FBX')
+    parser.add_argument('--webp', action='store_true', help='Automatically convert textures to WebP after export')
+    parser.add_argument('--manifest', help="Convert every '<input>\\t<output>' line of this file in one Blender session")
+    return parser
+
+
+def parse_settings(options):
+    settings = ConvertSettings(
+        remove_textures=options.remove_textures,
+        fix_origin=not options.no_fix_origin,
+        apply_texture_path=options.apply_texture_path,
+        merge_doubles=not options.no_merge_doubles,
+        export_glb=options.glb,
+        use_webp=options.webp,
+    )
+
+    if settings.use_webp:
+        print('[INFO] --webp flag detected: will export low quality/size textures as WebP')
+        settings.texture_format = 'JPEG'
+        settings.texture_quality = 30
+        settings.texture_size = 32
+        # Low-poly previews: coarser quantization is not visible at this poly count
+        settings.draco_position_bits = 11
+        settings.draco_normal_bits = 8
+        settings.draco_texcoord_bits = 10
+        settings.draco_color_bits = 8
+
+    if options.quality is not None:
+        ratio, texture_size, texture_format, texture_quality, keep_original, draco_bits = QUALITY_PRESETS[options.quality]
+        settings.ratio = ratio
+        settings.texture_size = texture_size
+        settings.texture_format = texture_format
+        if texture_quality is not None:
+            settings.texture_quality = texture_quality
+        settings.keep_original_textures = keep_original
+        # Preset bits win over the --webp track; explicit --draco-* flags win over both
+        if draco_bits is not None:
+            (settings.draco_position_bits, settings.draco_normal_bits,
+             settings.draco_texcoord_bits, settings.draco_color_bits) = draco_bits
+        print(f"[INFO] Using quality preset {options.quality}")
+
+    # Explicit parameters override presets
+    if options.ratio is not None:
+        settings.ratio = options.ratio
+    if options.texture_size is not None:
+        settings.texture_size = options.texture_size
+    if options.texture_format is not None:
+        settings.texture_format = options.texture_format
+    if options.texture_quality is not None:
+        settings.texture_quality = min(max(options.texture_quality, 0), 100)
+    if options.draco_pos_bits is not None:
+        settings.draco_position_bits = options.draco_pos_bits
+    if options.draco_normal_bits is not None:
+        settings.draco_normal_bits = options.draco_normal_bits
+    if settings.remove_textures:
+        settings.keep_original_textures = False
+    if options.keep_original_textures:
+        settings.keep_original_textures = True
+
+    settings.normal_map_size = options.normal_map_size or settings.texture_size
+    if settings.apply_texture_path:
+        print(f"[INFO] Will apply texture: {settings.apply_texture_path}")
+    return settings
+
+
+def reset_scene():
+    """Remove all objects and every datablock they leave orphaned."""
+    bpy.data.batch_remove(ids=list(bpy.data.objects))
+    bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+
+
+# (material, image) pairs keyed by image path, reused across a --manifest batch
+_image_materials = {}
+
+
+def build_image_material(image_path):
+    """Return (material, image): a Principled BSDF material textured with image_path, built once per session."""
+    cached = _image_materials.get(image_path)
+    if cached is not None:
+        return cached
+
+    img = bpy.data.images.load(image_path)
     tex_mat = bpy.data.materials.new(name="ImageTextureMaterial")
     tex_mat.use_nodes = True
+    # Keep the material (and its image) alive across reset_scene()
+    tex_mat.use_fake_user = True
     nodes = tex_mat.node_tree.nodes
     links = tex_mat.node_tree.links
     # Remove all nodes except output
@@ -220,298 +170,351 @@ if apply_texture_path:
     bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
     # Add Image Texture node
     tex_image = nodes.new(type='ShaderNodeTexImage')
-    try:
-        img = bpy.data.images.load(apply_texture_path)
-        tex_image.image = img
-    except Exception as e:
-        print(f"[ERROR] Could not load image: {e}")
-        sys.exit(1)
+    tex_image.image = img
     # Connect image color to BSDF base color
     links.new(tex_image.outputs['Color'], bsdf.inputs['Base Color'])
     # Connect BSDF to output
     output = nodes.get('Material Output')
     links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
-    # Remove all images (if any, except the loaded one)
-    for img in bpy.data.images:
-        if not (hasattr(tex_image, 'image') and img == tex_image.image):
-            bpy.data.images.remove(img)
-    # Assign material to all meshes
-    for obj in meshes:
-        obj.data.materials.clear()
-        obj.data.materials.append(tex_mat)
-    print("[INFO] Applied image texture material to all meshes")
-    # If exporting as FBX, print a warning about external texture
-    if not proceed_with_glb:
-        print("[WARNING] For FBX export, the texture file must be present alongside the FBX for it to show in other viewers.")
-else:
-    # --- Process textures if keeping them ---
-    if not remove_textures:
-        if not keep_original_textures:
-            # Identify normal maps for special handling
-            normal_maps = []
-            regular_textures = []
-            
-            # First pass to identify texture types
-            for mat in bpy.data.materials:
-                if mat.use_nodes:
-                    for node in mat.node_tree.nodes:
-                        if node.type == 'TEX_IMAGE' and node.image:
-                            is_normal_map = False
-                            # Check connections to see if it's a normal map
-                            for output in node.outputs:
-                                for link in output.links:
-                                    if link.to_node.type == 'NORMAL_MAP':
-                                        normal_maps.append(node.image)
-                                        is_normal_map = True
-                                        break
-                            if not is_normal_map:
-                                regular_textures.append(node.image)
-            
-            # Resize normal maps with higher quality
-            for img in normal_maps:
-                if img.has_data and img.size[0] > 0 and img.size[1] > 0:
-                    # Skip if already smaller than target size
-                    if img.size[0] <= normal_map_size and img.size[1] <= normal_map_size:
+
+    _image_materials[image_path] = tex_mat, img
+    return tex_mat, img
+
+
+def process_one(input_path, output_path, settings):
+    in_ext = os.path.splitext(input_path)[1].lower()
+    out_root, out_ext = os.path.splitext(output_path)
+    out_ext = out_ext.strip().lower()
+
+    # Ensure output has .glb extension only if --glb is present
+    if settings.export_glb and out_ext != '.glb':
+        output_path = f"{out_root}.glb"
+        out_ext = '.glb'
+        print(f"[INFO] Corrected output path to: {output_path}")
+
+    print(f"[INFO] Input: {input_path}")
+    print(f"[INFO] Output: {output_path}")
+
+    # --- Clean the scene (also drops data left over from the previous model) ---
+    reset_scene()
+
+    # --- Import model ---
+    if in_ext == '.fbx':
+        bpy.ops.import_scene.fbx(filepath=input_path)
+    elif in_ext in ('.glb', '.gltf'):
+        bpy.ops.import_scene.gltf(filepath=input_path)
+    else:
+        print(f"Unsupported file extension: {in_ext}")
+        return False
+
+    # --- Remove animations (to reduce file size) ---
+    if hasattr(bpy.data, 'actions'):
+        for action in bpy.data.actions:
+            bpy.data.actions.remove(action)
+        print("[INFO] Removed all animations")
+
+    # --- Find armature and main mesh ---
+    by_type, under_empty = categorize_objects(bpy.context.scene.objects)
+    meshes = by_type['MESH']
+    armature = by_type['ARMATURE'][0] if by_type['ARMATURE'] else None
+
+    if armature:
+        print(f"[INFO] Found armature: {armature.name}")
+    if meshes:
+        print(f"[INFO] Found {len(meshes)} mesh objects")
+
+    # --- Optionally apply a texture to all meshes ---
+    if settings.apply_texture_path:
+        try:
+            tex_mat, tex_image = build_image_material(settings.apply_texture_path)
+        except RuntimeError as e:
+            print(f"[ERROR] Could not load image: {e}")
+            return False
+        # Remove all images (if any, except the loaded one)
+        for img in list(bpy.data.images):
+            if img != tex_image:
+                bpy.data.images.remove(img)
+        # Assign material to all meshes
+        for obj in meshes:
+            obj.data.materials.clear()
+            obj.data.materials.append(tex_mat)
+        print("[INFO] Applied image texture material to all meshes")
+        # If exporting as FBX, print a warning about external texture
+        if not settings.export_glb:
+            print("[WARNING] For FBX export, the texture file must be present alongside the FBX for it to show in other viewers.")
+    else:
+        # --- Process textures if keeping them ---
+        if not settings.remove_textures:
+            if not settings.keep_original_textures:
+                # Classify each image once by name; normal map usage wins
+                texture_kinds = {}
+                for mat in bpy.data.materials:
+                    if mat.use_nodes:
+                        for node in mat.node_tree.nodes:
+                            if node.type == 'TEX_IMAGE' and node.image:
+                                name = node.image.name
+                                if texture_kinds.get(name) == 'normal':
+                                    continue
+                                # Check connections to see if it's a normal map
+                                is_normal_map = any(
+                                    link.to_node.type == 'NORMAL_MAP'
+                                    for output in node.outputs
+                                    for link in output.links
+                                )
+                                texture_kinds[name] = 'normal' if is_normal_map else 'regular'
+
+                # Single pass over all images, including ones no material references
+                resize_jobs = []
+                normal_flags = []
+                for img in bpy.data.images:
+                    if not (img.has_data and img.size[0] > 0 and img.size[1] > 0):
                         continue
-                        
-                    print(f"[INFO] Resizing normal map {img.name} from {img.size[0]}x{img.size[1]} to {normal_map_size}x{normal_map_size}")
-                    img.scale(normal_map_size, normal_map_size)
-                    img.file_format = 'PNG'  # Always use PNG for normal maps
-                    
-            # Resize regular textures
-            for img in regular_textures:
-                if img.has_data and img.size[0] > 0 and img.size[1] > 0:
+                    kind = texture_kinds.get(img.name)
+                    target_size = settings.normal_map_size if kind == 'normal' else settings.texture_size
+
                     # Skip if already smaller than target size
-                    if img.size[0] <= texture_size and img.size[1] <= texture_size:
+                    if img.size[0] <= target_size and img.size[1] <= target_size:
                         continue
-                    print(f"[INFO] Resizing texture {img.name} from {img.size[0]}x{img.size[1]} to {texture_size}x{texture_size}")
-                    img.scale(texture_size, texture_size)
-            
-            # Handle any images not processed yet
-            for img in bpy.data.images:
-                if img not in normal_maps and img not in regular_textures:
-                    if img.has_data and img.size[0] > 0 and img.size[1] > 0:
-                        if img.size[0] <= texture_size and img.size[1] <= texture_size:
-                            continue
-                        print(f"[INFO] Resizing other texture {img.name} from {img.size[0]}x{img.size[1]} to {texture_size}x{texture_size}")
-                        img.scale(texture_size, texture_size)
-            
-            print(f"[INFO] Processed {len(normal_maps)} normal maps at {normal_map_size}px and {len(regular_textures)} regular textures at {texture_size}px")
+
+                    label = {'normal': 'normal map', 'regular': 'texture'}.get(kind, 'other texture')
+                    print(f"[INFO] Resizing {label} {img.name} from {img.size[0]}x{img.size[1]} to {target_size}x{target_size}")
+                    resize_jobs.append((img, target_size))
+                    normal_flags.append(kind == 'normal')
+
+                # Independent images are resampled in parallel
+                for img, is_normal in zip(resize_images(resize_jobs), normal_flags):
+                    if is_normal:
+                        img.file_format = 'PNG'  # Always use PNG for normal maps
+
+                normal_count = sum(1 for kind in texture_kinds.values() if kind == 'normal')
+                print(f"[INFO] Processed {normal_count} normal maps at {settings.normal_map_size}px and {len(texture_kinds) - normal_count} regular textures at {settings.texture_size}px")
+            else:
+                print(f"[INFO] Keeping all original textures at full resolution")
         else:
-            print(f"[INFO] Keeping all original textures at full resolution")
-    else:
-        # Simplify or remove textures if requested
-        simple_mat = bpy.data.materials.new(name="SimpleMaterial")
-        simple_mat.use_nodes = True
-        nodes = simple_mat.node_tree.nodes
-        
-        # Clear all nodes except the output
-        for node in list(nodes):
-            if node.type != 'OUTPUT_MATERIAL':
-                nodes.remove(node)
-            
-        # Add a basic diffuse shader
-        diffuse = nodes.new(type='ShaderNodeBsdfDiffuse')
-        diffuse.inputs[0].default_value = (0.8, 0.8, 0.8, 1.0)  # Light gray
-        
-        # Connect to output
-        output = nodes.get('Material Output')
-        simple_mat.node_tree.links.new(diffuse.outputs['BSDF'], output.inputs['Surface'])
-        
-        # Remove all textures
-        for img in bpy.data.images:
-            bpy.data.images.remove(img)
-        
-        # Apply the simple material to all objects
-        for obj in meshes:
-            obj.data.materials.clear()
-            obj.data.materials.append(simple_mat)
-        
-        print("[INFO] Removed all textures and simplified materials")
-
-# --- Decimate all mesh objects ---
-for obj in meshes:
-    bpy.context.view_layer.objects.active = obj
-    obj.select_set(True)
-    
-    # Light cleanup to preserve more details
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.remove_doubles(threshold=0.0005)  # Less aggressive merge
-    bpy.ops.object.mode_set(mode='OBJECT')
-    
-    # Apply decimate modifier
-    dec = obj.modifiers.new(name="Decimate", type='DECIMATE')
-    dec.ratio = ratio
-    
-    # Add a smooth modifier after decimation to improve appearance
-    smooth = obj.modifiers.new(name="Smooth", type='SMOOTH')
-    smooth.iterations = 1
-    
-    # Apply modifiers
-    bpy.ops.object.modifier_apply(modifier=dec.name)
-    bpy.ops.object.modifier_apply(modifier=smooth.name)
-    
-    # Keep vertex normals to maintain model smoothness
-    # Note: use_auto_smooth was removed in Blender 4.1+
-    # Smooth shading is now controlled by the Smooth modifier above
-    
-    obj.select_set(False)
-    print(f"[INFO] Reduced {obj.name} to {len(obj.data.vertices)} vertices")
-
-# --- Fix model origin (from blender_prepare_tpose.py) ---
-if fix_origin and meshes:
-    # Find main mesh (if we have multiple)
-    main_mesh = meshes[0]
-    if len(meshes) > 1:
-        # Use the one with most vertices as main
-        main_mesh = max(meshes, key=lambda obj: len(obj.data.vertices))
-    
-    # Compute bounding box bottom center
-    bbox = [Vector(v) for v in main_mesh.bound_box]
-    xs = [v.x for v in bbox]
-    ys = [v.y for v in bbox]
-    zs = [v.z for v in bbox]
-    
-    center_x = (min(xs) + max(xs)) / 2
-    center_y = (min(ys) + max(ys)) / 2
-    min_z = min(zs)
-    
-    # Set cursor to bottom center of bounding box
-    bpy.context.scene.cursor.location = (center_x, center_y, min_z)
-    print(f"[DEBUG] Cursor set to bottom center at: {center_x}, {center_y}, {min_z}")
-    
-    # Set origin for armature first (if exists)
-    if armature:
-        print(f"[INFO] Setting armature origin to cursor (bottom center)")
-        bpy.ops.object.select_all(action='DESELECT')
-        armature.select_set(True)
-        bpy.context.view_layer.objects.active = armature
-        bpy.ops.object.origin_set(type='ORIGIN_CURSOR')
-        armature.location = (0.0, 0.0, 0.0)
-        print(f"[INFO] Armature moved to world origin (0,0,0)")
-    
-    # Set origin for all meshes
+            # Simplify or remove textures if requested
+            simple_mat = bpy.data.materials.new(name="SimpleMaterial")
+            simple_mat.use_nodes = True
+            nodes = simple_mat.node_tree.nodes
+
+            # Clear all nodes except the output
+            for node in list(nodes):
+                if node.type != 'OUTPUT_MATERIAL':
+                    nodes.remove(node)
+
+            # Add a basic diffuse shader
+            diffuse = nodes.new(type='ShaderNodeBsdfDiffuse')
+            diffuse.inputs[0].default_value = (0.8, 0.8, 0.8, 1.0)  # Light gray
+
+            # Connect to output
+            output = nodes.get('Material Output')
+            simple_mat.node_tree.links.new(diffuse.outputs['BSDF'], output.inputs['Surface'])
+
+            # Remove all textures
+            for img in bpy.data.images:
+                bpy.data.images.remove(img)
+
+            # Apply the simple material to all objects
+            for obj in meshes:
+                obj.data.materials.clear()
+                obj.data.materials.append(simple_mat)
+
+            print("[INFO] Removed all textures and simplified materials")
+
+    # --- Decimate all mesh objects ---
     for obj in meshes:
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        bpy.ops.object.origin_set(type='ORIGIN_CURSOR')
-        
-        # Only move to origin if not part of armature
-        if not obj.parent or obj.parent.type != 'ARMATURE':
-            obj.location = (0.0, 0.0, 0.0)
-    
-    print("[INFO] Origins set to bottom center and aligned to world origin")
-
-# --- Export model ---
-if proceed_with_glb:
-    # Export as GLB (and post-process as needed)
-    print('[INFO] --glb flag present. Exporting as GLB.')
-    bpy.ops.object.select_all(action='SELECT')
-
-    # Set export options for balanced file size and quality
-    export_settings = {
-        'filepath': output_path,
-        'export_format': 'GLB',
-        'use_selection': True,
-        'export_draco_mesh_compression_enable': True,
-        'export_draco_mesh_compression_level': 7,
-        'export_draco_position_quantization': 14,
-        'export_draco_normal_quantization': 10,
-        'export_draco_texcoord_quantization': 12,
-        'export_draco_color_quantization': 10,
-        'export_tangents': True,
-        'export_materials': True,
-        'export_colors': True,
-        'export_cameras': False,
-        'export_lights': False,
-        'export_extras': False,
-        'export_yup': True
-    }
-
-    # Adjust export settings based on texture quality preferences
-    if keep_original_textures:
-        export_settings['export_image_format'] = 'AUTO'
-        export_settings['export_jpeg_quality'] = 100
-    elif texture_format == 'JPEG':
-        export_settings['export_image_format'] = 'JPEG'
-        export_settings['export_jpeg_quality'] = texture_quality
-    else:
-        export_settings['export_image_format'] = 'AUTO'
-
-    # Try to use advanced export settings if available
-    try:
-        bpy.ops.export_scene.gltf(**export_settings)
-    except TypeError as e:
-        # Fall back to basic export if some parameters aren't supported
-        print(f"[WARNING] Using simplified export settings: {e}")
-        bpy.ops.export_scene.gltf(
-            filepath=output_path,
-            export_format='GLB',
-            use_selection=True,
-            export_draco_mesh_compression_enable=True
-        )
-
-    print(f"[INFO] Exported optimized low-poly model to: {output_path}")
-
-    # Report file size
-    if os.path.exists(output_path):
-        size_bytes_before_webp = os.path.getsize(output_path)
-        size_kb_before_webp = size_bytes_before_webp / 1024
-        print(f"[INFO] File size before WebP: {size_kb_before_webp:.2f} KB ({size_bytes_before_webp} bytes)")
-    else:
-        size_bytes_before_webp = None
-
-    # --- Call fix-origin-bottom.py to robustly fix the origin ---
-    fix_origin_script = os.path.join(os.path.dirname(__file__), 'fix-origin-bottom.py')
-    if os.path.exists(fix_origin_script):
-        print(f"[INFO] Running fix-origin-bottom.py on {output_path}")
-        blender_path = os.environ.get('BLENDER_PATH', 'blender')
-        result = subprocess.run([
-            blender_path, '--background', '--python', fix_origin_script, '--', output_path, output_path
-        ], capture_output=True, text=True)
-        print(result.stdout)
-        if result.returncode != 0:
-            print(f"[ERROR] fix-origin-bottom.py failed: {result.stderr}")
+        # Light cleanup to preserve more details, directly on the mesh data
+        vertex_count = len(obj.data.vertices)
+        if settings.merge_doubles and vertex_count > MERGE_DOUBLES_MAX_VERTICES:
+            print(f"[INFO] Skipping duplicate vertex merge on {obj.name} ({vertex_count} vertices)")
+        elif settings.merge_doubles:
+            bm = bmesh.new()
+            bm.from_mesh(obj.data)
+            bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0005)  # Less aggressive merge
+            bm.to_mesh(obj.data)
+            bm.free()
+
+        # Collapse decimation has no bmesh equivalent, so it stays a modifier
+        dec = obj.modifiers.new(name="Decimate", type='DECIMATE')
+        dec.ratio = settings.ratio
+        with bpy.context.temp_override(object=obj, active_object=obj):
+            bpy.ops.object.modifier_apply(modifier=dec.name)
+
+        # Smooth the decimated mesh to improve appearance (one Smooth modifier iteration)
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+        bmesh.ops.smooth_vert(bm, verts=bm.verts, factor=0.5, use_axis_x=True, use_axis_y=True, use_axis_z=True)
+        bm.to_mesh(obj.data)
+        bm.free()
+
+        # Keep vertex normals to maintain model smoothness
+        # Note: use_auto_smooth was removed in Blender 4.1+
+
+        print(f"[INFO] Reduced {obj.name} to {len(obj.data.vertices)} vertices")
+
+    # --- Fix model origin ---
+    if settings.fix_origin and meshes:
+        # Only offset the root objects; the imported hierarchy and transforms stay as they are
+        fix_origin_inplace(by_type, under_empty, flatten=False)
+
+    # --- Export model ---
+    if settings.export_glb:
+        # Export as GLB (and post-process as needed)
+        print('[INFO] --glb flag present. Exporting as GLB.')
+        bpy.ops.object.select_all(action='SELECT')
+
+        # Set export options for balanced file size and quality
+        export_settings = {
+            'filepath': output_path,
+            'export_format': 'GLB',
+            'use_selection': True,
+            'export_draco_mesh_compression_enable': True,
+            'export_draco_mesh_compression_level': 7,
+            'export_draco_position_quantization': settings.draco_position_bits,
+            'export_draco_normal_quantization': settings.draco_normal_bits,
+            'export_draco_texcoord_quantization': settings.draco_texcoord_bits,
+            'export_draco_color_quantization': settings.draco_color_bits,
+            'export_tangents': True,
+            'export_materials': True,
+            'export_colors': True,
+            'export_cameras': False,
+            'export_lights': False,
+            'export_extras': False,
+            'export_yup': True
+        }
+
+        # The image quality option was renamed across glTF exporter versions
+        gltf_props = bpy.ops.export_scene.gltf.get_rna_type().properties
+        quality_key = 'export_image_quality' if 'export_image_quality' in gltf_props else 'export_jpeg_quality'
+        # Newer exporters encode WebP themselves, so no post-processing pass is needed
+        exporter_webp = 'WEBP' in gltf_props['export_image_format'].enum_items.keys()
+
+        # Adjust export settings based on texture quality preferences
+        if settings.keep_original_textures:
+            export_settings['export_image_format'] = 'AUTO'
+            export_settings[quality_key] = 100
+        elif settings.use_webp and exporter_webp:
+            export_settings['export_image_format'] = 'WEBP'
+            export_settings[quality_key] = settings.texture_quality
+        elif settings.texture_format == 'JPEG':
+            export_settings['export_image_format'] = 'JPEG'
+            export_settings[quality_key] = settings.texture_quality
         else:
-            print(f"[INFO] Origin fix complete for {output_path}")
-    else:
-        print(f"[WARNING] fix-origin-bottom.py not found, skipping origin fix.")
+            export_settings['export_image_format'] = 'AUTO'
+        # Whatever format was chosen above decides the WebP log line and the fallback below
+        native_webp = export_settings['export_image_format'] == 'WEBP'
 
-    # After export and origin fix, post-process with gltf-transform if webp is requested or --webp flag is set
-    if texture_format.lower() == 'webp' or use_webp_flag:
-        print(f"[INFO] Converting textures to WebP using gltf-transform...")
+        # Try to use advanced export settings if available
         try:
-            result = subprocess.run([
-                'npx', 'gltf-transform', 'webp', output_path, output_path
-            ], capture_output=True, text=True)
-            print(result.stdout)
-            if result.returncode != 0:
-                print(f"[ERROR] gltf-transform webp failed: {result.stderr}")
+            bpy.ops.export_scene.gltf(**export_settings)
+        except TypeError as e:
+            # Fall back to basic export if some parameters aren't supported
+            print(f"[WARNING] Using simplified export settings: {e}")
+            native_webp = False
+            bpy.ops.export_scene.gltf(
+                filepath=output_path,
+                export_format='GLB',
+                use_selection=True,
+                export_draco_mesh_compression_enable=True
+            )
+
+        print(f"[INFO] Exported optimized low-poly model to: {output_path}")
+        if native_webp:
+            print(f"[INFO] Textures exported as WebP")
+
+        # WebP requested but not written by the exporter (older exporter, original textures kept
+        # or simplified export): post-process with gltf-transform
+        if settings.use_webp and not native_webp:
+            # Report file size
+            if os.path.exists(output_path):
+                size_bytes_before_webp = os.path.getsize(output_path)
+                size_kb_before_webp = size_bytes_before_webp / 1024
+                print(f"[INFO] File size before WebP: {size_kb_before_webp:.2f} KB ({size_bytes_before_webp} bytes)")
             else:
-                print(f"[INFO] WebP texture conversion complete for {output_path}")
-        except Exception as e:
-            print(f"[ERROR] Failed to run gltf-transform webp: {e}")
-
-    # Final file size and reduction summary
-    if os.path.exists(output_path):
-        size_bytes_final = os.path.getsize(output_path)
-        size_kb_final = size_bytes_final / 1024
-        print(f"[INFO] Final file size: {size_kb_final:.2f} KB ({size_bytes_final} bytes)")
-        if size_bytes_before_webp and size_bytes_final < size_bytes_before_webp:
-            reduction = 100 * (size_bytes_before_webp - size_bytes_final) / size_bytes_before_webp
-            print(f"[SUMMARY] Size reduction: {size_kb_before_webp:.2f} KB → {size_kb_final:.2f} KB (↓{reduction:.1f}%)")
-        elif size_bytes_before_webp:
-            print(f"[SUMMARY] No size reduction after WebP conversion.")
-else:
-    # Export as FBX only
-    print('[INFO] --glb flag not present. Exporting as FBX only.')
-    print(f"[DEBUG] Output path: '{output_path}'")
-    output_path_clean = output_path.strip().lower()
-    if output_path_clean.endswith('.fbx'):
-        bpy.ops.export_scene.fbx(filepath=output_path, use_selection=False)
-        print(f"[INFO] Exported as FBX: {output_path}")
+                size_bytes_before_webp = None
+
+            print(f"[INFO] Converting textures to WebP using gltf-transform...")
+            try:
+                result = subprocess.run([
+                    'npx', 'gltf-transform', 'webp', output_path, output_path
+                ], capture_output=True, text=True)
+                print(result.stdout)
+                if result.returncode != 0:
+                    print(f"[ERROR] gltf-transform webp failed: {result.stderr}")
+                else:
+                    print(f"[INFO] WebP texture conversion complete for {output_path}")
+            except Exception as e:
+                print(f"[ERROR] Failed to run gltf-transform webp: {e}")
+
+            # Reduction summary
+            if os.path.exists(output_path) and size_bytes_before_webp:
+                size_bytes_final = os.path.getsize(output_path)
+                size_kb_final = size_bytes_final / 1024
+                if size_bytes_final < size_bytes_before_webp:
+                    reduction = 100 * (size_bytes_before_webp - size_bytes_final) / size_bytes_before_webp
+                    print(f"[SUMMARY] Size reduction: {size_kb_before_webp:.2f} KB → {size_kb_final:.2f} KB (↓{reduction:.1f}%)")
+                else:
+                    print(f"[SUMMARY] No size reduction after WebP conversion.")
+
+        # Final file size
+        if os.path.exists(output_path):
+            size_bytes_final = os.path.getsize(output_path)
+            size_kb_final = size_bytes_final / 1024
+            print(f"[INFO] Final file size: {size_kb_final:.2f} KB ({size_bytes_final} bytes)")
     else:
-        print(f"[ERROR] Output path must end with .fbx if --glb is not specified.")
-        sys.exit(1) 
+        # Export as FBX only
+        print('[INFO] --glb flag not present. Exporting as FBX only.')
+        print(f"[DEBUG] Output path: '{output_path}'")
+        if out_ext == '.fbx':
+            bpy.ops.export_scene.fbx(filepath=output_path, use_selection=False)
+            print(f"[INFO] Exported as FBX: {output_path}")
+        else:
+            print(f"[ERROR] Output path must end with .fbx if --glb is not specified.")
+            return False
+
+    return True
+
+
+# --- Parse command-line arguments ---
+argv = sys.argv
+parser = build_parser()
+if "--" not in argv:
+    parser.print_help()
+    sys.exit(1)
+
+options, unknown = parser.parse_known_args(argv[argv.index("--") + 1:])
+if unknown:
+    print(f"[WARNING] Ignoring unknown arguments: {' '.join(unknown)}")
+
+# Batch mode amortizes Blender startup across many models
+if options.manifest:
+    jobs = read_manifest(options.manifest)
+elif len(options.paths) == 2:
+    jobs = [tuple(options.paths)]
+else:
+    parser.print_help()
+    sys.exit(1)
+
+settings = parse_settings(options)
+
+print(f"[INFO] Decimation ratio: {settings.ratio}")
+if settings.remove_textures:
+    print(f"[INFO] Textures: Removed")
+elif settings.keep_original_textures:
+    print(f"[INFO] Textures: Keeping originals (best quality)")
+else:
+    print(f"[INFO] Texture size: {settings.texture_size}px")
+    print(f"[INFO] Normal map size: {settings.normal_map_size}px")
+    print(f"[INFO] Texture format: {settings.texture_format}")
+    if settings.texture_format == 'JPEG':
+        print(f"[INFO] JPEG quality: {settings.texture_quality}")
+print(f"[INFO] Fix origin: {settings.fix_origin}")
+
+
+with headless_session():
+    failed = [input_path for input_path, output_path in jobs if not process_one(input_path, output_path, settings)]
+if len(jobs) > 1:
+    print(f"[SUMMARY] Converted {len(jobs) - len(failed)}/{len(jobs)} models")
+if failed:
+    for input_path in failed:
+        print(f"[ERROR] Failed to convert: {input_path}")
+    sys.exit(1)
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Fix a model's origin to the bottom center of its main mesh (from blender_prepare_tpose.py).
+
+convert-low-poly.py imports fix_origin_inplace() and runs it before export, keeping the
+imported hierarchy (flatten=False). Run on its own, it also flattens the hierarchy:
+
+    blender --background --python fix_origin_bottom.py -- <input_path> <output_path> [--preserve-animations] [--keep-materials] [--quiet]
+"""
+import bpy
+import sys
+import os
+import logging
+from contextlib import contextmanager
+import numpy as np
+from mathutils import Matrix, Vector
+
+# All output goes through this logger as "[LEVEL] message" lines; TPOSE_DEBUG=1 adds [DEBUG] ones
+log = logging.getLogger("tpose")
+log.setLevel(logging.DEBUG if os.environ.get("TPOSE_DEBUG") else logging.INFO)
+if not log.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    log.addHandler(_handler)
+    log.propagate = False
+
+IDENTITY = Matrix.Identity(4)
+# Origins closer than this to the target are left alone
+ORIGIN_EPSILON = 1e-6
+
+
+def run_op(op, targets, active=None, **kwargs):
+    """Run op once on targets (active defaults to the first) via a context override, leaving selection alone."""
+    targets = list(targets)
+    with bpy.context.temp_override(
+        selected_objects=targets,
+        selected_editable_objects=targets,
+        active_object=active or targets[0],
+        object=active or targets[0],
+    ):
+        return op(**kwargs)
+
+
+@contextmanager
+def headless_session():
+    """Turn off global undo and auto keying for a --background run, restoring both on exit."""
+    edit_prefs = bpy.context.preferences.edit
+    tool_settings = bpy.context.scene.tool_settings
+    saved = edit_prefs.use_global_undo, tool_settings.use_keyframe_insert_auto
+    # Every operator would otherwise snapshot the scene for an undo nobody can trigger
+    edit_prefs.use_global_undo = False
+    tool_settings.use_keyframe_insert_auto = False
+    try:
+        yield
+    finally:
+        edit_prefs.use_global_undo, tool_settings.use_keyframe_insert_auto = saved
+
+
+def _depth(obj):
+    """Number of ancestors above obj."""
+    depth = 0
+    while obj.parent is not None:
+        obj = obj.parent
+        depth += 1
+    return depth
+
+
+def categorize_objects(objects):
+    """Index objects by type in one pass.
+
+    Returns (by_type, under_empty): by_type maps 'MESH', 'ARMATURE' and 'EMPTY' to lists of
+    objects, under_empty lists the meshes/armatures parented to an EMPTY.
+    """
+    by_type = {'MESH': [], 'ARMATURE': [], 'EMPTY': []}
+    under_empty = []
+    for obj in objects:
+        obj_type = obj.type
+        bucket = by_type.get(obj_type)
+        if bucket is None:
+            continue
+        bucket.append(obj)
+        if obj_type != 'EMPTY':
+            parent = obj.parent
+            if parent is not None and parent.type == 'EMPTY':
+                under_empty.append(obj)
+    return by_type, under_empty
+
+
+def _root(obj):
+    """Topmost ancestor of obj (obj itself when it has no parent)."""
+    while obj.parent is not None:
+        obj = obj.parent
+    return obj
+
+
+def flatten_hierarchy(by_type, under_empty, verbose=True):
+    """Drop the EMPTY wrappers and bake every model transform into its data, like transform_apply.
+
+    by_type and under_empty come from categorize_objects() on the current scene.
+    """
+    meshes = by_type['MESH']
+    armature = by_type['ARMATURE'][0] if by_type['ARMATURE'] else None
+    empties = by_type['EMPTY']
+
+    # Detach meshes/armatures from the EMPTY wrappers importers create, in one operator call
+    if under_empty:
+        run_op(bpy.ops.object.parent_clear, under_empty, type='CLEAR_KEEP_TRANSFORM')
+
+    if empties:
+        bpy.data.batch_remove(ids=empties)
+        # Keep the index free of removed objects
+        by_type['EMPTY'] = []
+    if empties and verbose:
+        log.info("Removed %d empties", len(empties))
+
+    # Bake transforms into the data so bounding boxes are expressed in world space, without
+    # the transform_apply operator. World matrices are read up front: once a parent is reset,
+    # its children's cached matrix_world stays stale until the depsgraph is evaluated.
+    model = ([armature] if armature else []) + meshes
+    worlds = {obj: obj.matrix_world.copy() for obj in model}
+    baked = set()
+    for obj, world in worlds.items():
+        if world == IDENTITY:
+            continue
+        if obj.data.users > 1:
+            log.warning("Could not apply transform on %s: its data is shared with other objects", obj.name)
+            continue
+        baked.add(obj)
+
+    # Like transform_apply, keep every other child of a baked object where it is: children
+    # left unbaked, objects outside the model and bone-parented children (their world still
+    # follows the bone). Their target worlds are recorded before any parent changes.
+    restore = {}
+    for obj in baked:
+        for child in obj.children:
+            if child in baked and child.parent_type == 'OBJECT':
+                continue
+            restore[child] = IDENTITY if child in baked else child.matrix_world.copy()
+
+    for obj in baked:
+        world = worlds[obj]
+        if obj.type == 'MESH':
+            # Shape keys hold the evaluated positions, so they move with the vertices
+            obj.data.transform(world, shape_keys=True)
+            if world.is_negative:
+                obj.data.flip_normals()
+        else:
+            obj.data.transform(world)
+        parent = obj.parent
+        if parent is None or (parent in baked and obj.parent_type == 'OBJECT'):
+            # The parent ends up at identity too, so identity local matrices give an identity world
+            obj.matrix_parent_inverse = IDENTITY
+            obj.matrix_basis = IDENTITY
+        elif obj not in restore:
+            # The parent keeps its transform, so its cached world is still valid
+            obj.matrix_world = IDENTITY
+
+    if restore:
+        # Assigning matrix_world resolves against the parent's evaluated world, so evaluate the
+        # parents' new state first, one hierarchy level at a time
+        view_layer = bpy.context.view_layer
+        level = None
+        for child, world in sorted(restore.items(), key=lambda item: _depth(item[0])):
+            child_level = _depth(child)
+            if child_level != level:
+                view_layer.update()
+                level = child_level
+            child.matrix_world = world
+
+
+def fix_origin_inplace(by_type, under_empty, verbose=True, flatten=True):
+    """Move the model so the bottom center of its main mesh sits at the world origin.
+
+    With flatten, flatten_hierarchy() runs first; otherwise the hierarchy and object
+    transforms are left as imported and only the root objects are offset.
+    verbose=False skips [INFO] output.
+    """
+    if flatten:
+        flatten_hierarchy(by_type, under_empty, verbose=verbose)
+    meshes = by_type['MESH']
+    armature = by_type['ARMATURE'][0] if by_type['ARMATURE'] else None
+    model = ([armature] if armature else []) + meshes
+
+    # Evaluate pending edits once, so bound_box, matrix_world and the exporters see them
+    bpy.context.evaluated_depsgraph_get().update()
+
+    # Find main mesh (if we have multiple)
+    main_mesh = meshes[0]
+    if len(meshes) > 1:
+        # Use the one with most vertices as main
+        main_mesh = max(meshes, key=lambda obj: len(obj.data.vertices))
+
+    # Compute the world-space bounding box bottom center (matrix_world is identity once flattened)
+    corners = np.fromiter((c for v in main_mesh.bound_box for c in v), dtype=np.float64, count=24).reshape(8, 3)
+    world = np.array(main_mesh.matrix_world, dtype=np.float64)
+    corners = corners @ world[:3, :3].T + world[:3, 3]
+    mn = corners.min(axis=0)
+    mx = corners.max(axis=0)
+
+    center_x = float(mn[0] + mx[0]) * 0.5
+    center_y = float(mn[1] + mx[1]) * 0.5
+    min_z = float(mn[2])
+
+    bottom_center = Vector((center_x, center_y, min_z))
+    log.debug("Bottom center at: %s, %s, %s", center_x, center_y, min_z)
+
+    # Offset the model's root objects rather than rewriting vertex data: the exporters write
+    # matrix_world into the node transforms, and everything parented follows its root
+    shifted = bottom_center.length > ORIGIN_EPSILON
+    if shifted:
+        shift = Matrix.Translation(-bottom_center)
+        for root in {_root(obj) for obj in model}:
+            root.matrix_world = shift @ root.matrix_world
+    if verbose and shifted:
+        log.info("Model shifted by -(%.4f, %.4f, %.4f) so its bottom center is at the world origin",
+                 center_x, center_y, min_z)
+    elif verbose:
+        log.info("Model bottom center is already at the world origin")
+
+
+def run(input_path, output_path, *, preserve_animations=False, keep_materials=False, verbose=False):
+    """Import input_path, fix its origin and export it to output_path. Returns False on failure.
+
+    GLB output carries geometry and skeleton only unless keep_materials is set.
+    """
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+    # read_homefile() replaces the scene, so the session settings go on after it
+    with headless_session():
+        ext = os.path.splitext(input_path)[1].lower()
+        if ext == '.fbx':
+            bpy.ops.import_scene.fbx(filepath=input_path)
+        elif ext in ('.glb', '.gltf'):
+            bpy.ops.import_scene.gltf(filepath=input_path)
+        else:
+            log.error("Unsupported file extension: %s", ext)
+            return False
+
+        by_type, under_empty = categorize_objects(bpy.context.scene.objects)
+        if not by_type['MESH']:
+            log.error("No mesh found in scene.")
+            return False
+
+        fix_origin_inplace(by_type, under_empty, verbose=verbose)
+
+        out_ext = os.path.splitext(output_path)[1].lower()
+        if out_ext == '.fbx':
+            bpy.ops.export_scene.fbx(filepath=output_path, use_selection=False, bake_anim=preserve_animations)
+        else:
+            export_settings = {
+                'filepath': output_path,
+                'export_format': 'GLB',
+                'export_apply': False,
+                'export_animations': preserve_animations,
+                'export_cameras': False,
+                'export_lights': False,
+            }
+            if not keep_materials:
+                # Skip the exporter's material and image passes entirely
+                export_settings['export_materials'] = 'NONE'
+                gltf_props = bpy.ops.export_scene.gltf.get_rna_type().properties
+                if 'NONE' in gltf_props['export_image_format'].enum_items.keys():
+                    export_settings['export_image_format'] = 'NONE'
+            bpy.ops.export_scene.gltf(**export_settings)
+        if verbose:
+            log.info("Exported with its bottom center at the world origin to: %s", output_path)
+        return True
+
+
+def main():
+    argv = sys.argv
+    args = argv[argv.index("--") + 1:] if "--" in argv else []
+    paths = [arg for arg in args if not arg.startswith('--')]
+    if len(paths) < 2:
+        print("Usage: blender --background --python fix_origin_bottom.py -- <input_path> <output_path> "
+              "[--preserve-animations] [--keep-materials] [--quiet]")
+        sys.exit(1)
+
+    ok = run(
+        paths[0],
+        paths[1],
+        preserve_animations='--preserve-animations' in args,
+        keep_materials='--keep-materials' in args,
+        verbose='--quiet' not in args,
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Read '<input>\t<output>' job manifests shared by convert-low-poly.py --manifest and batch_prepare.py.
+
+Blank lines and lines starting with '#' are skipped.
+"""
+import sys
+
+
+def read_manifest(manifest_path):
+    jobs = []
+    with open(manifest_path) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split('\t')
+            if len(parts) != 2:
+                print(f"[ERROR] Invalid manifest line: {line}")
+                sys.exit(1)
+            jobs.append((parts[0], parts[1]))
+    return jobs
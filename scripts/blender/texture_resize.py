@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Resize Blender images in parallel with Pillow.
+
+Pillow releases the GIL while resampling and encoding, so a thread pool resizes several
+textures at once inside the Blender process. Each result is encoded in the image's own file
+format and packed back into the same datablock, so its filepath, format and users are kept
+for the exporters. Images Pillow cannot round-trip (generated, float, or in a format it has
+no encoder for) fall back to img.scale(), as does everything when Pillow is not installed
+in Blender's Python.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Blender file formats Pillow can write back, with their save() options
+PIL_FORMATS = {
+    'PNG': ('PNG', {}),
+    'JPEG': ('JPEG', {'quality': 95}),
+    'BMP': ('BMP', {}),
+    'TARGA': ('TGA', {}),
+    'TIFF': ('TIFF', {}),
+    'WEBP': ('WEBP', {'quality': 95}),
+}
+
+
+def _resample(pixels, width, height, channels, size, file_format, keep_alpha):
+    """Resize bottom-up float pixels and return them encoded as file_format."""
+    pil_format, save_options = PIL_FORMATS[file_format]
+    rgba = (pixels.reshape(height, width, channels) * 255.0 + 0.5).clip(0, 255).astype(np.uint8)
+    # Blender stores rows bottom-up, image files top-down
+    resized = Image.fromarray(np.flipud(rgba)).resize((size, size), Image.LANCZOS)
+    if resized.mode == 'RGBA' and not keep_alpha:
+        resized = resized.convert('RGB')
+    buffer = io.BytesIO()
+    resized.save(buffer, format=pil_format, **save_options)
+    return buffer.getvalue()
+
+
+def _can_resample(img):
+    return (img.source == 'FILE' and img.file_format in PIL_FORMATS
+            and not img.is_float and img.channels in (3, 4))
+
+
+def resize_images(jobs):
+    """Resize each (image, size) pair to size x size in place and return the images in order."""
+    pending = []
+    for img, size in jobs:
+        if Image is None or not _can_resample(img):
+            img.scale(size, size)
+        else:
+            width, height = img.size
+            pixels = np.empty(width * height * img.channels, dtype=np.float32)
+            img.pixels.foreach_get(pixels)
+            keep_alpha = img.file_format != 'JPEG' and img.depth != 24
+            pending.append((img, (pixels, width, height, img.channels, size, img.file_format, keep_alpha)))
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as pool:
+            encoded = list(pool.map(lambda job: _resample(*job[1]), pending))
+        # bpy is not thread-safe: pack the results on the main thread. pack() replaces any
+        # previously packed data; freeing the buffers makes the next access decode it. No
+        # reload(): that would re-read the full-size file still at img.filepath.
+        for (img, _), data in zip(pending, encoded):
+            img.pack(data=data, data_len=len(data))
+            img.buffers_free()
+
+    return [img for img, _ in jobs]